@@ -2,15 +2,23 @@
 Модуль для асинхронной поддержки в ArgentaX.
 
 Этот модуль содержит классы и функции для работы с асинхронными командами.
+
+Если установлен пакет uvloop (необязательная зависимость), он используется
+в качестве политики цикла событий.
 """
 
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, List
 import asyncio
 import inspect
-import functools
 
-from ..app import App
-from ..command.base import Command
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+from ..app import App, _EXIT_SENTINEL
 from ..utils.exceptions import CommandExecutionError
 
 
@@ -87,28 +95,9 @@ class AsyncApp(App):
             cmd_name = name or func.__name__
             cmd_description = description or func.__doc__
             
-            # Проверяем, асинхронная ли функция
-            is_async = inspect.iscoroutinefunction(func)
-            
-            if is_async:
-                # Для асинхронных функций создаем обертку
-                @functools.wraps(func)
-                def async_wrapper(*args, **kwargs):
-                    # Запускаем асинхронную функцию в текущем цикле событий
-                    # или создаем новый, если его нет
-                    try:
-                        loop = asyncio.get_event_loop()
-                    except RuntimeError:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    
-                    return loop.run_until_complete(func(*args, **kwargs))
-                
-                # Регистрируем обертку как обычную команду
-                return super().command(cmd_name, cmd_description, aliases)(async_wrapper)
-            else:
-                # Для синхронных функций используем обычную регистрацию
-                return super().command(cmd_name, cmd_description, aliases)(func)
+            # Асинхронные функции регистрируются как есть: execute сам
+            # дожидается их выполнения в текущем цикле событий
+            return super(AsyncApp, self).command(cmd_name, cmd_description, aliases)(func)
         
         return decorator
     
@@ -120,10 +109,12 @@ class AsyncApp(App):
         while True:
             try:
                 command_line = self.console.input(self.prompt)
-                if not command_line.strip():
+                if not command_line or command_line.isspace():
                     continue
                 
                 result = await self.execute(command_line)
+                if result is _EXIT_SENTINEL:
+                    break
                 if result is not None:
                     self.console.print(str(result))
             
@@ -147,17 +138,22 @@ class AsyncApp(App):
             CommandNotFoundError: Если команда не найдена
             CommandError: При ошибке выполнения команды
         """
+        for hook in self._pre_execute_hooks:
+            hook(command_line)
+        
         try:
             # Разбор командной строки
             command, args, kwargs = self.router.parse_command_line(command_line)
             
-            # Получаем оригинальный обработчик
-            handler = command.handler
+            # Тип обработчика кэшируется в App.command; для команд,
+            # добавленных в маршрутизатор напрямую, определяем его здесь один раз
+            is_async = getattr(command, "_is_async", None)
+            if is_async is None:
+                is_async = command._is_async = inspect.iscoroutinefunction(command.handler)
             
-            # Проверяем, асинхронный ли обработчик
-            if inspect.iscoroutinefunction(handler):
+            if is_async:
                 # Выполняем асинхронно
-                return await handler(*args, **kwargs)
+                return await command.handler(*args, **kwargs)
             else:
                 # Выполняем синхронно
                 return command.execute(*args, **kwargs)
@@ -5,10 +5,9 @@
 для создания интерактивных командных оболочек с помощью ArgentaX.
 """
 
-from typing import Any, Callable, Dict, List, Optional, Union, Type
-import sys
-import shlex
-from inspect import signature, Parameter
+from typing import Any, Callable, Dict, List, Optional
+import io
+from inspect import signature, Parameter, iscoroutinefunction
 
 from .command.base import Command
 from .command.flags import Flag
@@ -19,6 +18,13 @@ from .utils.exceptions import CommandNotFoundError, CommandExecutionError
 from .plugins.base import Plugin
 
 
+# Максимальный размер кэша справки по командам
+_HELP_CACHE_SIZE = 128
+
+# Возвращается командой выхода, чтобы завершить интерактивный режим без SystemExit
+_EXIT_SENTINEL = object()
+
+
 class App:
     """Основной класс приложения ArgentaX.
     
@@ -72,6 +78,11 @@ class App:
         self.router = Router(case_sensitive=case_sensitive)
         self.console = Console(theme=self.theme)
         self.plugins = plugins or []
+        self._pre_execute_hooks: List[Callable[[str], None]] = []
+        
+        # Кэш справки по командам, сбрасывается при изменении набора команд
+        self._command_help_cache: Dict[str, Optional[str]] = {}  # Имя -> текст справки
+        self._command_help_version = self.router.version
         
         # Регистрация встроенных команд
         self._register_builtin_commands()
@@ -80,13 +91,21 @@ class App:
         for plugin in self.plugins:
             plugin.initialize(self)
     
+    def add_pre_execute_hook(self, hook: Callable[[str], None]) -> None:
+        """Добавляет функцию, вызываемую перед выполнением каждой команды.
+        
+        Args:
+            hook: Функция, принимающая строку команды
+        """
+        self._pre_execute_hooks.append(hook)
+    
     def _register_builtin_commands(self) -> None:
         """Регистрирует встроенные команды."""
         
         @self.command(self.exit_command, "Выход из приложения")
         def exit_app():
             """Выход из приложения."""
-            sys.exit(0)
+            return _EXIT_SENTINEL
         
         @self.command("help", "Показать справку по командам")
         def help_command(command: str = None):
@@ -96,9 +115,9 @@ class App:
                 command: Имя команды для получения подробной справки
             """
             if command:
-                cmd = self.router.get_command(command)
-                if cmd:
-                    return self._format_command_help(cmd)
+                help_text = self._format_command_help_by_name(command)
+                if help_text is not None:
+                    return help_text
                 else:
                     return f"Команда '{command}' не найдена."
             else:
@@ -106,59 +125,74 @@ class App:
     
     def _format_help(self) -> str:
         """Форматирует общую справку по командам."""
-        result = [f"{self.name}", "-" * len(self.name), ""]
+        buf = io.StringIO()
+        buf.write(f"{self.name}\n{'-' * len(self.name)}\n\n")
         
         if self.description:
-            result.extend([self.description, ""])
+            buf.write(f"{self.description}\n\n")
+        
+        buf.write("Доступные команды:")
         
-        result.append("Доступные команды:")
+        for cmd in self.router.get_sorted_commands():
+            buf.write(f"\n  {cmd.name:<15} - {cmd.description or 'Нет описания'}")
         
-        # Группировка команд по категориям
-        commands = self.router.get_all_commands()
+        buf.write(
+            f"\n\nВведите '{self.exit_command}' для выхода или 'help <команда>' для получения справки по конкретной команде."
+        )
         
-        for cmd in sorted(commands, key=lambda c: c.name):
-            result.append(f"  {cmd.name:<15} - {cmd.description or 'Нет описания'}")
+        return buf.getvalue()
+    
+    def _format_command_help_by_name(self, name: str) -> Optional[str]:
+        """Возвращает справку по команде, используя кэш.
+        
+        Args:
+            name: Имя команды или псевдоним
+            
+        Returns:
+            Текст справки или None, если команда не найдена
+        """
+        cache = self._command_help_cache
+        if self._command_help_version != self.router.version:
+            cache.clear()
+            self._command_help_version = self.router.version
         
-        result.extend([
-            "",
-            f"Введите '{self.exit_command}' для выхода или 'help <команда>' для получения справки по конкретной команде."
-        ])
+        if name in cache:
+            return cache[name]
         
-        return "\n".join(result)
+        command = self.router.get_command(name)
+        help_text = self._format_command_help(command) if command else None
+        if len(cache) >= _HELP_CACHE_SIZE:
+            cache.clear()
+        cache[name] = help_text
+        return help_text
     
     def _format_command_help(self, command: Command) -> str:
         """Форматирует справку по конкретной команде."""
-        result = [f"Команда: {command.name}", ""]
+        buf = io.StringIO()
+        buf.write(f"Команда: {command.name}\n")
         
         if command.description:
-            result.extend([command.description, ""])
+            buf.write(f"\n{command.description}\n")
         
         # Получение информации о параметрах
-        params = []
+        has_params = False
         for name, param in command.get_parameters().items():
             if isinstance(param, Flag):
-                flag_info = f"--{name}"
+                if not has_params:
+                    buf.write("\nПараметры:")
+                    has_params = True
+                buf.write(f"\n  --{name}")
                 if param.description:
-                    flag_info += f": {param.description}"
+                    buf.write(f": {param.description}")
                 if param.default is not None:
-                    flag_info += f" (по умолчанию: {param.default})"
+                    buf.write(f" (по умолчанию: {param.default})")
                 if param.required:
-                    flag_info += " [обязательный]"
-                params.append(flag_info)
-        
-        if params:
-            result.append("Параметры:")
-            for param in params:
-                result.append(f"  {param}")
+                    buf.write(" [обязательный]")
         
         if command.aliases:
-            result.extend([
-                "",
-                "Альтернативные имена:",
-                "  " + ", ".join(command.aliases)
-            ])
+            buf.write("\n\nАльтернативные имена:\n  " + ", ".join(command.aliases))
         
-        return "\n".join(result)
+        return buf.getvalue()
     
     def command(
         self, 
@@ -186,26 +220,30 @@ class App:
             cmd_description = description or func.__doc__
             
             # Анализ сигнатуры функции для создания флагов
-            flags = {}
-            sig = signature(func)
+            empty = Parameter.empty
+            pairs = []
             
-            for param_name, param in sig.parameters.items():
+            for param_name, param in signature(func).parameters.items():
+                default = param.default
                 # Если параметр уже является флагом, используем его
-                if param.default is not Parameter.empty and isinstance(param.default, Flag):
-                    flag = param.default
-                    flag.name = param_name  # Убедимся, что имя флага соответствует параметру
-                    flags[param_name] = flag
+                if default is not empty and isinstance(default, Flag):
+                    default.name = param_name  # Убедимся, что имя флага соответствует параметру
+                    pairs.append((param_name, default))
                 # Иначе создаем флаг на основе аннотации типа и значения по умолчанию
                 elif param_name != 'self':  # Пропускаем self для методов
-                    default = None if param.default is Parameter.empty else param.default
-                    param_type = param.annotation if param.annotation is not Parameter.empty else type(default) if default is not None else str
-                    required = param.default is Parameter.empty
-                    flags[param_name] = Flag(
+                    required = default is empty
+                    if required:
+                        default = None
+                    annotation = param.annotation
+                    param_type = annotation if annotation is not empty else type(default) if default is not None else str
+                    pairs.append((param_name, Flag(
                         name=param_name,
                         type=param_type,
                         default=default,
                         required=required
-                    )
+                    )))
+            
+            flags = dict(pairs)
             
             # Создание и регистрация команды
             command = Command(
@@ -215,6 +253,8 @@ class App:
                 aliases=aliases,
                 flags=flags
             )
+            # Тип обработчика определяется один раз при регистрации
+            command._is_async = iscoroutinefunction(func)
             
             self.router.add_command(command)
             return func
@@ -229,10 +269,12 @@ class App:
         while True:
             try:
                 command_line = self.console.input(self.prompt)
-                if not command_line.strip():
+                if not command_line or command_line.isspace():
                     continue
                 
                 result = self.execute(command_line)
+                if result is _EXIT_SENTINEL:
+                    break
                 if result is not None:
                     self.console.print(str(result))
             
@@ -256,32 +298,60 @@ class App:
             CommandNotFoundError: Если команда не найдена
             CommandError: При ошибке выполнения команды
         """
+        for hook in self._pre_execute_hooks:
+            hook(command_line)
+        
         try:
-            # Разбор командной строки
-            command, args, kwargs = self.router.parse_command_line(command_line)
-            
-            # Выполнение команды
-            return command.execute(*args, **kwargs)
+            return self._execute_fast(command_line)
         
         except CommandNotFoundError:
-            # Если команда не найдена, пробуем найти похожие
-            tokens = shlex.split(command_line)
-            if not tokens:
-                return None
-            
-            cmd_name = tokens[0]
-            similar_commands = self.router.find_similar_commands(cmd_name)
-            
-            if similar_commands:
-                suggestions = ", ".join(similar_commands)
-                raise CommandNotFoundError(
-                    f"Команда '{cmd_name}' не найдена. Возможно, вы имели в виду: {suggestions}"
-                )
-            else:
-                raise CommandNotFoundError(f"Команда '{cmd_name}' не найдена.")
+            raise
         
         except Exception as e:
             # Оборачиваем все остальные исключения
             if not isinstance(e, CommandExecutionError):
                 raise CommandExecutionError(f"Ошибка при выполнении команды: {str(e)}") from e
             raise
+    
+    def _execute_fast(self, command_line: str) -> Any:
+        """Разбирает и выполняет команду без обертывания исключений.
+        
+        Args:
+            command_line: Строка с командой и аргументами
+            
+        Returns:
+            Результат выполнения команды
+        """
+        try:
+            # Разбор командной строки
+            command, args, kwargs = self.router.parse_command_line(command_line)
+        except CommandNotFoundError:
+            return self._suggest(command_line)
+        
+        # Выполнение команды
+        return command.execute(*args, **kwargs)
+    
+    def _suggest(self, command_line: str) -> None:
+        """Сообщает о ненайденной команде, предлагая похожие.
+        
+        Args:
+            command_line: Строка с командой и аргументами
+            
+        Raises:
+            CommandNotFoundError: Всегда, если строка не пуста
+        """
+        # Нужен только первый токен, полноценный разбор shlex не требуется
+        tokens = command_line.split(None, 1)
+        if not tokens:
+            return None
+        
+        cmd_name = tokens[0]
+        similar_commands = self.router.find_similar_commands(cmd_name)
+        
+        if similar_commands:
+            suggestions = ", ".join(similar_commands)
+            raise CommandNotFoundError(
+                f"Команда '{cmd_name}' не найдена. Возможно, вы имели в виду: {suggestions}"
+            )
+        else:
+            raise CommandNotFoundError(f"Команда '{cmd_name}' не найдена.")
@@ -4,7 +4,9 @@
 Этот модуль содержит базовые классы для создания и управления плагинами.
 """
 
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Deque, List, Optional
+from collections import deque
+from bisect import bisect_left
 
 
 class Plugin:
@@ -45,7 +47,8 @@ class HistoryPlugin(Plugin):
         """
         super().__init__(name="History", description="Сохраняет историю команд")
         self.max_history = max_history
-        self.history = []
+        # При переполнении самые старые команды вытесняются автоматически
+        self.history: Deque[str] = deque(maxlen=max_history)
     
     def initialize(self, app: Any) -> None:
         """Инициализирует плагин.
@@ -55,17 +58,8 @@ class HistoryPlugin(Plugin):
         """
         super().initialize(app)
         
-        # Оборачиваем метод execute приложения для сохранения истории
-        original_execute = app.execute
-        
-        def execute_with_history(command_line: str) -> Any:
-            # Добавляем команду в историю
-            self.add_to_history(command_line)
-            # Вызываем оригинальный метод
-            return original_execute(command_line)
-        
-        # Заменяем метод execute
-        app.execute = execute_with_history
+        # Сохраняем историю перед выполнением каждой команды
+        app.add_pre_execute_hook(self.add_to_history)
     
     def add_to_history(self, command_line: str) -> None:
         """Добавляет команду в историю.
@@ -76,9 +70,6 @@ class HistoryPlugin(Plugin):
         # Не добавляем пустые строки и дубликаты
         if command_line.strip() and (not self.history or self.history[-1] != command_line):
             self.history.append(command_line)
-            # Ограничиваем размер истории
-            if len(self.history) > self.max_history:
-                self.history.pop(0)
     
     def get_history(self) -> List[str]:
         """Возвращает историю команд.
@@ -86,7 +77,7 @@ class HistoryPlugin(Plugin):
         Returns:
             Список строк команд
         """
-        return self.history.copy()
+        return list(self.history)
     
     def clear_history(self) -> None:
         """Очищает историю команд."""
@@ -113,15 +104,33 @@ class AutocompletePlugin(Plugin):
         try:
             import readline
             
+            sorted_names: List[str] = []
+            names_version = -1
+            last_text: Optional[str] = None
+            last_matches: List[str] = []
+            
             def completer(text, state):
-                # Получаем все команды
-                commands = [cmd.name for cmd in app.router.get_all_commands()]
+                nonlocal sorted_names, names_version, last_text, last_matches
+                
+                # Отсортированный список имен перестраивается только
+                # после регистрации новых команд
+                if names_version != app.router.version:
+                    sorted_names = sorted(cmd.name for cmd in app.router.get_all_commands())
+                    names_version = app.router.version
+                    last_text = None
                 
-                # Фильтруем команды, начинающиеся с введенного текста
-                matches = [cmd for cmd in commands if cmd.startswith(text)]
+                # readline вызывает completer для каждого state с тем же текстом,
+                # поэтому совпадения вычисляются один раз
+                if text != last_text:
+                    last_matches = []
+                    for i in range(bisect_left(sorted_names, text), len(sorted_names)):
+                        if not sorted_names[i].startswith(text):
+                            break
+                        last_matches.append(sorted_names[i])
+                    last_text = text
                 
                 # Возвращаем соответствующую команду или None, если нет совпадений
-                return matches[state] if state < len(matches) else None
+                return last_matches[state] if state < len(last_matches) else None
             
             # Устанавливаем функцию автодополнения
             readline.set_completer(completer)
@@ -4,14 +4,12 @@
 Этот модуль содержит класс Console для вывода стилизованного текста в терминал.
 """
 
-from typing import Optional
-import sys
-import re
+from typing import Any, Dict, Optional, Tuple
 
 try:
     from rich.console import Console as RichConsole
     from rich.theme import Theme as RichTheme
-    from rich.prompt import Prompt
+    from rich.text import Text
     RICH_AVAILABLE = True
 except ImportError:
     RICH_AVAILABLE = False
@@ -19,8 +17,20 @@ except ImportError:
 from .theme import Theme
 
 
+# Стили темы, которые использует консоль
+_STYLE_NAMES = ("prompt", "command", "error", "help", "divider")
+
+# Темы Rich, построенные по значениям стилей. Ключом служат сами стили,
+# а не объект Theme, поскольку Theme можно изменить через set_style.
+_RICH_THEME_CACHE: Dict[Tuple[str, ...], Any] = {}
+
+
 class Console:
-    """Обертка для работы с консолью."""
+    """Обертка для работы с консолью.
+    
+    Стили темы кэшируются и перечитываются, когда тема изменяется через
+    Theme.set_style. Тема Rich строится один раз при создании консоли.
+    """
     
     def __init__(self, theme: Optional[Theme] = None):
         """Инициализация консоли.
@@ -30,19 +40,38 @@ class Console:
         """
         self.theme = theme or Theme()
         
+        # Стили темы разрешаются один раз, а не при каждом выводе
+        self._load_styles()
+        
         # Инициализация Rich, если доступен
         if RICH_AVAILABLE:
-            rich_theme = RichTheme({
-                "prompt": self.theme.get_style("prompt"),
-                "command": self.theme.get_style("command"),
-                "error": self.theme.get_style("error"),
-                "help": self.theme.get_style("help"),
-                "divider": self.theme.get_style("divider"),
-            })
+            key = tuple(self._styles.values())
+            rich_theme = _RICH_THEME_CACHE.get(key)
+            if rich_theme is None:
+                rich_theme = RichTheme(self._styles)
+                _RICH_THEME_CACHE[key] = rich_theme
             self.rich_console = RichConsole(theme=rich_theme)
         else:
             self.rich_console = None
     
+    def _load_styles(self) -> None:
+        """Кэширует стили текущей темы."""
+        self._styles: Dict[str, str] = {name: self.theme.get_style(name) for name in _STYLE_NAMES}
+        self._theme_version = self.theme.version
+    
+    def _style(self, name: str) -> str:
+        """Возвращает кэшированный стиль, перечитывая тему после ее изменения.
+        
+        Args:
+            name: Имя стиля
+            
+        Returns:
+            Строка стиля
+        """
+        if self._theme_version != self.theme.version:
+            self._load_styles()
+        return self._styles[name]
+    
     def print(self, text: str, style: str = None) -> None:
         """Выводит текст в консоль.
         
@@ -66,10 +95,11 @@ class Console:
             Введенная пользователем строка
         """
         if style is None:
-            style = self.theme.get_style("prompt")
+            style = self._style("prompt")
         
-        if self.rich_console and RICH_AVAILABLE:
-            return Prompt.ask(prompt, console=self.rich_console)
+        if self.rich_console:
+            # Prompt.ask избыточен для чтения строки без проверки значения
+            return self.rich_console.input(Text(prompt, style=style))
         else:
             return input(prompt)
     
@@ -79,7 +109,7 @@ class Console:
         Args:
             text: Текст сообщения
         """
-        self.print(text, style=self.theme.get_style("error"))
+        self.print(text, style=self._style("error"))
     
     def success(self, text: str) -> None:
         """Выводит сообщение об успехе.
@@ -87,7 +117,7 @@ class Console:
         Args:
             text: Текст сообщения
         """
-        self.print(text, style=self.theme.get_style("command"))
+        self.print(text, style=self._style("command"))
     
     def help(self, text: str) -> None:
         """Выводит справочное сообщение.
@@ -95,7 +125,7 @@ class Console:
         Args:
             text: Текст сообщения
         """
-        self.print(text, style=self.theme.get_style("help"))
+        self.print(text, style=self._style("help"))
     
     def divider(self, char: str = "-", width: int = 80) -> None:
         """Выводит разделительную линию.
@@ -104,4 +134,4 @@ class Console:
             char: Символ для разделительной линии
             width: Ширина разделительной линии
         """
-        self.print(char * width, style=self.theme.get_style("divider"))
+        self.print(char * width, style=self._style("divider"))
@@ -4,50 +4,74 @@
 Этот модуль содержит классы для создания и управления флагами команд.
 """
 
-from typing import Any, Dict, List, Optional, Pattern, Type, Union
+from typing import Any, Callable, Dict, List, Mapping, Optional, Pattern, Type, Union
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
 import re
 
 
+@lru_cache(maxsize=None)
+def _compile(pattern: str) -> Pattern:
+    """Компилирует регулярное выражение, переиспользуя уже скомпилированные.
+    
+    Args:
+        pattern: Строка регулярного выражения
+        
+    Returns:
+        Скомпилированное регулярное выражение
+    """
+    return re.compile(pattern)
+
+
+@dataclass(slots=True, eq=False)
 class Flag:
-    """Флаг команды."""
-    
-    def __init__(
-        self,
-        name: str = None,
-        type: Type = str,
-        default: Any = None,
-        required: bool = False,
-        description: str = None,
-        choices: List[Any] = None,
-        pattern: Optional[Pattern] = None,
-    ):
-        """Инициализация флага.
+    """Флаг команды.
+    
+    Attributes:
+        name: Имя флага
+        type: Тип значения флага
+        default: Значение по умолчанию
+        required: Является ли флаг обязательным
+        description: Описание флага
+        choices: Список допустимых значений
+        pattern: Регулярное выражение для проверки значения (строка или
+            скомпилированное выражение)
+    """
+    
+    name: Optional[str] = None
+    type: Type = str
+    default: Any = None
+    required: bool = False
+    description: Optional[str] = None
+    choices: Optional[List[Any]] = None
+    pattern: Optional[Union[str, Pattern]] = None
+    _match: Optional[Callable[[str], Any]] = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        """Компилирует шаблон и запоминает метод проверки."""
+        # Строка компилируется один раз, одинаковые шаблоны разделяют объект
+        if isinstance(self.pattern, str):
+            self.pattern = _compile(self.pattern)
+        self._match = self.pattern.fullmatch if self.pattern is not None else None
+    
+    def validate(self, value: str) -> bool:
+        """Проверяет значение на соответствие шаблону флага.
         
         Args:
-            name: Имя флага
-            type: Тип значения флага
-            default: Значение по умолчанию
-            required: Является ли флаг обязательным
-            description: Описание флага
-            choices: Список допустимых значений
-            pattern: Регулярное выражение для проверки значения
+            value: Строковое значение флага
+            
+        Returns:
+            True, если шаблон не задан или значение ему соответствует
         """
-        self.name = name
-        self.type = type
-        self.default = default
-        self.required = required
-        self.description = description
-        self.choices = choices
-        self.pattern = pattern
-    
-    def __repr__(self) -> str:
-        """Строковое представление флага."""
-        return f"Flag(name={self.name}, type={self.type.__name__}, default={self.default}, required={self.required})"
+        return self._match is None or self._match(value) is not None
 
 
 class Flags:
     """Коллекция флагов команды."""
     
+    __slots__ = ("_flags", "_view")
+    
     def __init__(self, *flags: Flag):
         """Инициализация коллекции флагов.
         
@@ -55,6 +79,7 @@ class Flags:
             *flags: Флаги для добавления в коллекцию
         """
         self._flags: Dict[str, Flag] = {}
+        self._view: Mapping[str, Flag] = MappingProxyType(self._flags)
         
         for flag in flags:
             if flag.name:
@@ -80,13 +105,16 @@ class Flags:
         """
         return self._flags.get(name)
     
-    def get_all(self) -> Dict[str, Flag]:
-        """Возвращает словарь всех флагов.
+    def get_all(self) -> Mapping[str, Flag]:
+        """Возвращает все флаги в виде словаря только для чтения.
+        
+        Словарь отражает последующие изменения коллекции; для добавления
+        флагов используйте add.
         
         Returns:
             Словарь флагов, где ключ - имя флага, значение - объект Flag
         """
-        return self._flags.copy()
+        return self._view
     
     def __iter__(self):
         """Итератор по флагам."""
@@ -97,18 +125,17 @@ class Flags:
         return len(self._flags)
 
 
+@dataclass(slots=True, frozen=True)
 class InputFlag:
-    """Флаг, введенный пользователем."""
+    """Флаг, введенный пользователем.
     
-    def __init__(self, name: str, value: Any):
-        """Инициализация введенного флага.
-        
-        Args:
-            name: Имя флага
-            value: Значение флага
-        """
-        self.name = name
-        self.value = value
+    Attributes:
+        name: Имя флага
+        value: Значение флага
+    """
+    
+    name: str
+    value: Any
     
     def get_name(self) -> str:
         """Возвращает имя флага."""
@@ -117,26 +144,22 @@ class InputFlag:
     def get_value(self) -> Any:
         """Возвращает значение флага."""
         return self.value
-    
-    def __repr__(self) -> str:
-        """Строковое представление флага."""
-        return f"InputFlag(name={self.name}, value={self.value})"
 
 
 class InputFlags:
     """Коллекция флагов, введенных пользователем."""
     
+    __slots__ = ("_flags",)
+    
     def __init__(self, flags: Dict[str, Any] = None):
         """Инициализация коллекции введенных флагов.
         
         Args:
             flags: Словарь флагов, где ключ - имя флага, значение - значение флага
         """
-        self._flags: Dict[str, InputFlag] = {}
-        
-        if flags:
-            for name, value in flags.items():
-                self._flags[name] = InputFlag(name, value)
+        # Храним сами значения; объекты InputFlag создаются только по запросу.
+        # Словарь строится одним вызовом с известным заранее размером
+        self._flags: Dict[str, Any] = dict(flags) if flags else {}
     
     def add(self, name: str, value: Any) -> None:
         """Добавляет флаг в коллекцию.
@@ -145,7 +168,7 @@ class InputFlags:
             name: Имя флага
             value: Значение флага
         """
-        self._flags[name] = InputFlag(name, value)
+        self._flags[name] = value
     
     def get(self, name: str) -> Optional[InputFlag]:
         """Возвращает флаг по имени.
@@ -156,7 +179,7 @@ class InputFlags:
         Returns:
             Объект InputFlag или None, если флаг не найден
         """
-        return self._flags.get(name)
+        return InputFlag(name, self._flags[name]) if name in self._flags else None
     
     def get_value(self, name: str, default: Any = None) -> Any:
         """Возвращает значение флага по имени.
@@ -168,12 +191,11 @@ class InputFlags:
         Returns:
             Значение флага или default, если флаг не найден
         """
-        flag = self._flags.get(name)
-        return flag.value if flag else default
+        return self._flags.get(name, default)
     
     def __iter__(self):
         """Итератор по флагам."""
-        return iter(self._flags.values())
+        return (InputFlag(name, value) for name, value in self._flags.items())
     
     def __len__(self) -> int:
         """Количество флагов в коллекции."""
@@ -3,16 +3,254 @@
 
 Этот модуль содержит класс Router, который отвечает за маршрутизацию
 команд и разбор командной строки.
+
+Поиск похожих команд использует rapidfuzz, если он установлен, иначе
+ускоряется с помощью Numba, если установлена она. Обе библиотеки
+импортируются при первом поиске, а не при импорте модуля. Поведение
+JIT-компиляции настраивается переменными окружения:
+    ARGENTAX_JIT_EAGER=1 - выбрать механизм поиска при импорте модуля и,
+        если rapidfuzz не установлен, скомпилировать JIT-версию
+    ARGENTAX_DISABLE_JIT=1 - не использовать Numba
 """
 
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+import re
+import sys
 import shlex
-import difflib
+import heapq
+import bisect
 
 from .command.base import Command
 from .utils.exceptions import CommandNotFoundError
 
 
+# Максимальный размер кэша поиска команд по имени в исходном регистре
+_LOOKUP_CACHE_SIZE = 256
+
+# Токен - последовательность из обычных символов и строк в кавычках без
+# пробелов между ними; любой другой непробельный символ (незакрытая кавычка)
+# попадает во вторую группу. Пробельные символы те же, что у shlex.
+_TOKEN_RE = re.compile(r"""((?:[^ \t\r\n"']+|"[^"]*"|'[^']*')+)|([^ \t\r\n])""")
+# Строка из одного слова без кавычек и экранирования, например "help"
+_WORD_RE = re.compile(r"[ \t\r\n]*([^ \t\r\n\"'\\]+)[ \t\r\n]*")
+_QUOTED_RE = re.compile(r"\"([^\"]*)\"|'([^']*)'")
+
+
+def _split_command_line(command_line: str) -> List[str]:
+    """Разбивает строку на токены так же, как shlex.split.
+    
+    Строки без обратной косой черты и с парными кавычками разбираются одним
+    регулярным выражением, остальные передаются shlex.
+    
+    Args:
+        command_line: Строка команды
+        
+    Returns:
+        Список токенов
+        
+    Raises:
+        ValueError: Если строку не удалось разобрать
+    """
+    if "\\" in command_line:
+        return shlex.split(command_line)
+    
+    tokens = []
+    for match in _TOKEN_RE.finditer(command_line):
+        token = match.group(1)
+        if token is None:
+            # Незакрытая кавычка: shlex сообщит об ошибке
+            return shlex.split(command_line)
+        if '"' in token or "'" in token:
+            token = _QUOTED_RE.sub(r"\1\2", token)
+        tokens.append(token)
+    
+    return tokens
+
+
+def _env_flag(name: str) -> bool:
+    """Проверяет, включен ли флаг в переменной окружения."""
+    return os.environ.get(name, "").lower() not in ("", "0", "false", "no")
+
+
+def _edit_distance(a, b) -> int:
+    """Вычисляет расстояние Дамерау-Левенштейна (OSA) между двумя последовательностями.
+    
+    Принимает строки или массивы кодов символов. Во втором случае
+    функция может быть скомпилирована Numba.
+    
+    Args:
+        a: Первая последовательность
+        b: Вторая последовательность
+        
+    Returns:
+        Минимальное количество вставок, удалений, замен и перестановок
+        соседних символов
+    """
+    n = len(a)
+    m = len(b)
+    
+    # Храним только три последние строки матрицы расстояний
+    prev2 = list(range(m + 1))
+    prev = list(range(m + 1))
+    curr = list(range(m + 1))
+    
+    for i in range(1, n + 1):
+        curr[0] = i
+        for j in range(1, m + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+            # Перестановка соседних символов
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d = min(d, prev2[j - 2] + 1)
+            curr[j] = d
+        prev2, prev, curr = prev, curr, prev2
+    
+    return prev[m]
+
+
+# numpy и JIT-версия _edit_distance, заполняются в _load_jit
+_np: Any = None
+_edit_distance_jit: Optional[Callable[[Any, Any], int]] = None
+_jit_loaded = False
+
+
+def _load_jit() -> bool:
+    """Импортирует Numba и компилирует _edit_distance при первом обращении.
+    
+    Импорт numpy и numba занимает сотни миллисекунд, поэтому он откладывается
+    до первого поиска похожих команд. Повторные вызовы возвращают результат
+    первого.
+    
+    Returns:
+        True, если JIT-версия _edit_distance доступна
+    """
+    global _np, _edit_distance_jit, _jit_loaded
+    if not _jit_loaded:
+        _jit_loaded = True
+        if _env_flag("ARGENTAX_DISABLE_JIT"):
+            return False
+        try:
+            import numpy
+            from numba import njit
+        except ImportError:
+            return False
+        
+        _np = numpy
+        if _env_flag("ARGENTAX_JIT_EAGER"):
+            # Явная сигнатура: компиляция сразу, без задержки на первой опечатке
+            _edit_distance_jit = njit("i4(u4[::1], u4[::1])", cache=True)(_edit_distance)
+        else:
+            _edit_distance_jit = njit(cache=True)(_edit_distance)
+    return _edit_distance_jit is not None
+
+
+# Механизм поиска похожих команд: "rapidfuzz", "jit" или "trie"
+_similarity_backend: Optional[str] = None
+_rapidfuzz_extract: Optional[Callable[..., List[Tuple[str, float, int]]]] = None
+_osa_similarity: Optional[Callable[[str, str], float]] = None
+
+
+def _get_similarity_backend() -> str:
+    """Выбирает механизм поиска похожих команд при первом обращении.
+    
+    rapidfuzz имеет приоритет, поэтому Numba импортируется, только если
+    rapidfuzz не установлен.
+    
+    Returns:
+        "rapidfuzz", "jit" или "trie"
+    """
+    global _similarity_backend, _rapidfuzz_extract, _osa_similarity
+    if _similarity_backend is None:
+        try:
+            from rapidfuzz import process
+            from rapidfuzz.distance import OSA
+        except ImportError:
+            _similarity_backend = "jit" if _load_jit() else "trie"
+        else:
+            _rapidfuzz_extract = process.extract
+            _osa_similarity = OSA.normalized_similarity
+            _similarity_backend = "rapidfuzz"
+    return _similarity_backend
+
+
+# При установленном rapidfuzz JIT-версия не используется и не компилируется
+if _env_flag("ARGENTAX_JIT_EAGER"):
+    _get_similarity_backend()
+
+
+# Ключ узла префиксного дерева, под которым хранится индекс имени;
+# не совпадает ни с одним символом
+_TRIE_END = ""
+
+
+def _build_trie(names: List[str]) -> Dict[str, Any]:
+    """Строит префиксное дерево имен.
+    
+    Args:
+        names: Список имен
+        
+    Returns:
+        Дерево из вложенных словарей; в конечных узлах под ключом _TRIE_END
+        хранится индекс имени в списке
+    """
+    root: Dict[str, Any] = {}
+    for index, name in enumerate(names):
+        node = root
+        for char in name:
+            node = node.setdefault(char, {})
+        node.setdefault(_TRIE_END, index)
+    return root
+
+
+def _search_trie(trie: Dict[str, Any], name: str, max_distance: float) -> List[Tuple[int, int]]:
+    """Находит в префиксном дереве имена на расстоянии OSA не больше заданного.
+    
+    Строки матрицы расстояний для общего префикса вычисляются один раз,
+    а поддеревья, в которых расстояние не может уложиться в предел, пропускаются.
+    
+    Args:
+        trie: Дерево, построенное _build_trie
+        name: Искомое имя
+        max_distance: Максимальное допустимое расстояние
+        
+    Returns:
+        Список пар (индекс имени, расстояние)
+    """
+    m = len(name)
+    found = []
+    
+    def visit(node: Dict[str, Any], prev_char: str, prev_row: List[int], prev2_row: Optional[List[int]]) -> None:
+        for char, child in node.items():
+            if char == _TRIE_END:
+                continue
+            
+            row = [prev_row[0] + 1]
+            for j in range(1, m + 1):
+                cost = 0 if name[j - 1] == char else 1
+                d = min(prev_row[j] + 1, row[j - 1] + 1, prev_row[j - 1] + cost)
+                # Перестановка соседних символов
+                if prev2_row is not None and j > 1 and name[j - 2] == char and name[j - 1] == prev_char:
+                    d = min(d, prev2_row[j - 2] + 1)
+                row.append(d)
+            
+            index = child.get(_TRIE_END)
+            if index is not None and row[m] <= max_distance:
+                found.append((index, row[m]))
+            
+            # Значения в строках ниже не меньше min(row) и min(prev_row) + 1
+            if min(row) <= max_distance or min(prev_row) + 1 <= max_distance:
+                visit(child, char, row, prev_row)
+    
+    visit(trie, "", list(range(m + 1)), None)
+    return found
+
+
+def _encode(name: str) -> Any:
+    """Преобразует строку в массив кодов символов для JIT-версии _edit_distance."""
+    return _np.frombuffer(bytearray(name.encode("utf-32-le")), dtype=_np.uint32)
+
+
 class Router:
     """Маршрутизатор команд.
     
@@ -27,7 +265,21 @@ class Router:
         """
         self._commands: Dict[str, Command] = {}
         self._aliases: Dict[str, str] = {}  # Отображение псевдонимов на имена команд
+        self._by_name: Dict[str, Command] = {}  # Имена и псевдонимы -> команда
+        self._sorted_commands: List[Command] = []  # Команды, упорядоченные по имени
+        self._lookup_cache: Dict[str, Command] = {}  # Имя в исходном виде -> команда
         self.case_sensitive = case_sensitive
+        
+        # Нормализация имени выбирается один раз: str.lower или str,
+        # который для строки возвращает ее саму
+        self._norm: Callable[[str], str] = str if case_sensitive else str.lower
+        self.version = 0  # Увеличивается при каждом изменении набора команд
+        
+        # Имена для поиска похожих команд и их закодированная форма, строятся лениво
+        self._all_names_cache: Optional[List[str]] = None
+        self._encoded_names: Optional[List[Any]] = None
+        self._names_trie: Optional[Dict[str, Any]] = None
+        self._max_name_len = 0
     
     def add_command(self, command: Command) -> None:
         """Добавляет команду в маршрутизатор.
@@ -35,18 +287,38 @@ class Router:
         Args:
             command: Команда для добавления
         """
-        name = command.name
-        
-        # Если не учитываем регистр, приводим имя к нижнему регистру
-        if not self.case_sensitive:
-            name = name.lower()
+        # Если не учитываем регистр, приводим имя к нижнему регистру.
+        # Ключи интернируются, чтобы сравнение при поиске сводилось к проверке идентичности
+        name = sys.intern(self._norm(command.name))
         
+        previous = self._commands.get(name)
         self._commands[name] = command
         
+        # Поддерживаем упорядоченный список вместо сортировки при каждом запросе
+        if previous is not None:
+            self._sorted_commands.remove(previous)
+        bisect.insort(self._sorted_commands, command, key=lambda c: c.name)
+        
+        # Псевдонимы имеют приоритет над именами команд
+        if name not in self._aliases:
+            self._by_name[name] = command
+        
+        # Обновляем уже зарегистрированные псевдонимы этой команды
+        for alias_key, target in self._aliases.items():
+            if target == name:
+                self._by_name[alias_key] = command
+        
         # Добавляем псевдонимы
         for alias in command.aliases:
-            alias_key = alias if self.case_sensitive else alias.lower()
+            alias_key = sys.intern(self._norm(alias))
             self._aliases[alias_key] = name
+            self._by_name[alias_key] = command
+        
+        self._all_names_cache = None
+        self._encoded_names = None
+        self._names_trie = None
+        self._lookup_cache.clear()
+        self.version += 1
     
     def get_command(self, name: str) -> Optional[Command]:
         """Возвращает команду по имени.
@@ -57,15 +329,21 @@ class Router:
         Returns:
             Объект Command или None, если команда не найдена
         """
+        # Повторные обращения по тому же имени обходятся без нормализации
+        command = self._lookup_cache.get(name)
+        if command is not None:
+            return command
+        
         # Если не учитываем регистр, приводим имя к нижнему регистру
-        if not self.case_sensitive:
-            name = name.lower()
+        key = self._norm(name)
         
-        # Проверяем, является ли имя псевдонимом
-        if name in self._aliases:
-            name = self._aliases[name]
+        command = self._by_name.get(key)
+        if command is not None:
+            if len(self._lookup_cache) >= _LOOKUP_CACHE_SIZE:
+                self._lookup_cache.clear()
+            self._lookup_cache[name] = command
         
-        return self._commands.get(name)
+        return command
     
     def get_all_commands(self) -> List[Command]:
         """Возвращает список всех зарегистрированных команд.
@@ -75,6 +353,16 @@ class Router:
         """
         return list(self._commands.values())
     
+    def get_sorted_commands(self) -> List[Command]:
+        """Возвращает список команд, упорядоченный по имени.
+        
+        Список поддерживается маршрутизатором и не должен изменяться вызывающим кодом.
+        
+        Returns:
+            Список объектов Command
+        """
+        return self._sorted_commands
+    
     def parse_command_line(self, command_line: str) -> Tuple[Command, List[Any], Dict[str, Any]]:
         """Разбирает строку команды на команду и аргументы.
         
@@ -87,18 +375,25 @@ class Router:
         Raises:
             CommandNotFoundError: Если команда не найдена
         """
-        # Разбиваем строку на токены, учитывая кавычки
-        try:
-            tokens = shlex.split(command_line)
-        except ValueError as e:
-            # Ошибка разбора строки (например, незакрытые кавычки)
-            raise ValueError(f"Ошибка разбора командной строки: {str(e)}")
-        
-        if not tokens:
-            raise ValueError("Пустая командная строка")
-        
-        # Первый токен - имя команды
-        cmd_name = tokens[0]
+        # Команда без аргументов не требует полного разбора
+        word = _WORD_RE.fullmatch(command_line)
+        if word is not None:
+            cmd_name = word.group(1)
+            tokens = []
+        else:
+            # Разбиваем строку на токены, учитывая кавычки
+            try:
+                tokens = _split_command_line(command_line)
+            except ValueError as e:
+                # Ошибка разбора строки (например, незакрытые кавычки)
+                raise ValueError(f"Ошибка разбора командной строки: {str(e)}")
+            
+            if not tokens:
+                raise ValueError("Пустая командная строка")
+            
+            # Первый токен - имя команды; остальные токены остаются в том же
+            # списке, чтобы не создавать срез при передаче в parse_args
+            cmd_name = tokens.pop(0)
         
         # Получаем команду
         command = self.get_command(cmd_name)
@@ -106,7 +401,7 @@ class Router:
             raise CommandNotFoundError(f"Команда '{cmd_name}' не найдена")
         
         # Разбираем аргументы
-        args, kwargs = command.parse_args(tokens[1:])
+        args, kwargs = command.parse_args(tokens)
         
         return command, args, kwargs
     
@@ -120,13 +415,67 @@ class Router:
         Returns:
             Список имен похожих команд
         """
-        if not self.case_sensitive:
-            name = name.lower()
+        name = self._norm(name)
+        
+        # Все имена команд и псевдонимы, перестраиваются только после add_command
+        if self._all_names_cache is None:
+            self._all_names_cache = list(dict.fromkeys([*self._commands, *self._aliases]))
+        all_names = self._all_names_cache
+        
+        backend = _similarity_backend or _get_similarity_backend()
+        
+        if backend == "rapidfuzz":
+            # Та же метрика (OSA, нормированная по длине более длинного имени),
+            # но все кандидаты обрабатываются одним вызовом на C++.
+            # score_cutoff не используется: rapidfuzz отбрасывает совпадения
+            # ровно на пороге, поэтому порог применяется к трем лучшим результатам
+            matches = _rapidfuzz_extract(
+                name,
+                all_names,
+                scorer=_osa_similarity,
+                processor=None,
+                limit=3,
+            )
+            return [candidate_name for candidate_name, score, _ in matches if score >= threshold]
+        
+        # Схожесть: 1 - расстояние / длина более длинного имени
+        name_len = len(name)
+        
+        if backend == "trie":
+            # Без компилятора обходим префиксное дерево: общие префиксы имен
+            # обрабатываются один раз
+            if self._names_trie is None:
+                self._names_trie = _build_trie(all_names)
+                self._max_name_len = max(map(len, all_names), default=0)
+            
+            max_distance = (1 - threshold) * max(name_len, self._max_name_len)
+            scored = []
+            for index, distance in _search_trie(self._names_trie, name, max_distance):
+                candidate_name = all_names[index]
+                score = 1 - distance / max(name_len, len(candidate_name))
+                if score >= threshold:
+                    scored.append((score, -index))
+            
+            best = heapq.nlargest(3, scored)
+            return [all_names[-index] for _, index in best]
         
-        # Получаем все имена команд и псевдонимы
-        all_names = list(self._commands.keys()) + list(self._aliases.keys())
+        # Имена команд кодируются один раз и переиспользуются между вызовами
+        if self._encoded_names is None:
+            self._encoded_names = [_encode(candidate) for candidate in all_names]
+        query = _encode(name)
         
-        # Находим похожие имена
-        similar = difflib.get_close_matches(name, all_names, n=3, cutoff=threshold)
+        scored = []
+        for candidate_name, candidate in zip(all_names, self._encoded_names):
+            candidate_len = len(candidate_name)
+            longest = max(name_len, candidate_len)
+            if not longest:
+                continue
+            # Расстояние не меньше разницы длин: заведомо далекие имена
+            # отбрасываются без вычисления расстояния
+            if 1 - abs(name_len - candidate_len) / longest < threshold:
+                continue
+            score = 1 - _edit_distance_jit(query, candidate) / longest
+            if score >= threshold:
+                scored.append((score, candidate_name))
         
-        return similar
+        return [candidate_name for _, candidate_name in heapq.nlargest(3, scored, key=lambda item: item[0])]
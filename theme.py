@@ -4,12 +4,17 @@
 Этот модуль содержит классы для стилизации и отображения текста в консоли.
 """
 
-from typing import Dict, Optional
-import sys
+from typing import Dict
 
 
 class Theme:
-    """Тема оформления интерфейса."""
+    """Тема оформления интерфейса.
+    
+    Стили хранятся в словаре, а стандартные доступны и как свойства.
+    Любое изменение проходит через set_style и увеличивает version.
+    """
+    
+    __slots__ = ("_styles", "version")
     
     def __init__(
         self,
@@ -28,13 +33,14 @@ class Theme:
             help: Стиль справки
             divider: Стиль разделителя
         """
-        self.styles = {
+        self._styles: Dict[str, str] = {
             "prompt": prompt,
             "command": command,
             "error": error,
             "help": help,
             "divider": divider,
         }
+        self.version = 0  # Увеличивается при каждом вызове set_style
     
     def get_style(self, name: str) -> str:
         """Возвращает стиль по имени.
@@ -45,7 +51,7 @@ class Theme:
         Returns:
             Строка стиля или пустая строка, если стиль не найден
         """
-        return self.styles.get(name, "")
+        return self._styles.get(name, "")
     
     def set_style(self, name: str, style: str) -> None:
         """Устанавливает стиль.
@@ -54,4 +60,50 @@ class Theme:
             name: Имя стиля
             style: Строка стиля
         """
-        self.styles[name] = style
+        self._styles[name] = style
+        self.version += 1
+    
+    @property
+    def prompt(self) -> str:
+        """Стиль строки приглашения."""
+        return self._styles["prompt"]
+    
+    @prompt.setter
+    def prompt(self, style: str) -> None:
+        self.set_style("prompt", style)
+    
+    @property
+    def command(self) -> str:
+        """Стиль команды."""
+        return self._styles["command"]
+    
+    @command.setter
+    def command(self, style: str) -> None:
+        self.set_style("command", style)
+    
+    @property
+    def error(self) -> str:
+        """Стиль сообщения об ошибке."""
+        return self._styles["error"]
+    
+    @error.setter
+    def error(self, style: str) -> None:
+        self.set_style("error", style)
+    
+    @property
+    def help(self) -> str:
+        """Стиль справки."""
+        return self._styles["help"]
+    
+    @help.setter
+    def help(self, style: str) -> None:
+        self.set_style("help", style)
+    
+    @property
+    def divider(self) -> str:
+        """Стиль разделителя."""
+        return self._styles["divider"]
+    
+    @divider.setter
+    def divider(self, style: str) -> None:
+        self.set_style("divider", style)